@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import random
 import re
 import time
 import uuid
 from collections import OrderedDict
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any, Mapping
 from urllib.parse import urlparse
 
@@ -17,31 +18,103 @@ from astrbot.api.star import Context, Star, StarTools, register
 
 try:
     # AstrBot 常见加载方式：package.module（需要相对导入）
-    from .video_api import ProviderConfig, TaskSnapshot, VideoApiClient, VideoApiError
+    from .video_api import (
+        ProviderConfig,
+        TaskSnapshot,
+        VideoApiClient,
+        VideoApiError,
+        json_dumps,
+        json_loads,
+    )
 except ImportError:
     # 兼容直接以脚本/顶层模块方式加载
-    from video_api import ProviderConfig, TaskSnapshot, VideoApiClient, VideoApiError
+    from video_api import (
+        ProviderConfig,
+        TaskSnapshot,
+        VideoApiClient,
+        VideoApiError,
+        json_dumps,
+        json_loads,
+    )
 
 try:
     from astrbot.api import AstrBotConfig
 except Exception:  # pragma: no cover - 兼容旧版本类型导出
     AstrBotConfig = dict  # type: ignore[assignment]
 
+try:
+    # 可选依赖 lru-dict：C 实现的 LRU，读写与淘汰均在 C 层完成
+    from lru import LRU as _LRUCache
+except ImportError:  # pragma: no cover - 未安装时回退到纯 Python 实现
+    _LRUCache = None
+
+
+class _OrderedLRU(OrderedDict):
+    """lru-dict 不可用时的回退实现，get/赋值语义与 lru.LRU 一致。"""
+
+    def __init__(self, size: int):
+        super().__init__()
+        self._size = size
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self._size:
+            self.popitem(last=False)
+
+
+def _new_lru_cache(size: int) -> Any:
+    if _LRUCache is not None:
+        return _LRUCache(size)
+    return _OrderedLRU(size)
+
 
 @register("video_generate_tool", "SaltedDoubao", "多服务商视频生成工具", "0.1.0")
 class VideoGenerateToolPlugin(Star):
     _TASK_CACHE_MAX = 200
+    _POLL_INITIAL_DELAY = 1.0
+    _POLL_BACKOFF_FACTOR = 1.25
+    _POLL_ERROR_BASE_DELAY = 0.5
     _debug = False
 
     def __init__(self, context: Context, config: AstrBotConfig | None = None):
         super().__init__(context)
         self.config = config or {}
+        # KV 读写接口在实例化时解析一次，旧版本 AstrBot 不提供时为 None
+        putter = getattr(self, "put_kv_data", None)
+        getter = getattr(self, "get_kv_data", None)
+        self._put_kv = putter if callable(putter) else None
+        self._get_kv = getter if callable(getter) else None
         self._debug = bool(self._cfg_get("debug_mode", False))
         self._video_cache_dir = self._prepare_video_cache_dir()
         self._cache_cleanup_task: asyncio.Task[None] | None = None
         self._pending_delete_tasks: set[asyncio.Task[None]] = set()
-        self._task_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        # task_id -> (记录, 解析后的 TaskSnapshot)；get 与赋值都会刷新最近使用顺序，
+        # 超出容量时自动淘汰最久未用的记录
+        self._task_cache = _new_lru_cache(self._TASK_CACHE_MAX)
+        # 待写入 KV 的脏数据：每个 key 仅保留最新值，由后台任务定期合并写入
+        self._dirty_tasks: dict[str, dict[str, Any]] = {}
+        self._dirty_last_task: dict[str, str] = {}
+        # 仅存在于内存、尚未进入写入队列的任务（persist=False 保存）
+        self._memory_only_tasks: set[str] = set()
+        # 会话 -> 最近任务 ID 的内存镜像，用于跳过未变化的指针写入
+        self._session_last_task = _new_lru_cache(self._TASK_CACHE_MAX)
+        self._kv_flush_task: asyncio.Task[None] | None = None
+        # 刷新互斥：避免旧记录的写入晚于新记录落盘；停止信号让后台任务写完当前批次再退出
+        self._kv_flush_lock = asyncio.Lock()
+        self._kv_flush_stop = asyncio.Event()
+        self._raw_max_chars = max(int(self._cfg_get("task_raw_max_chars", 8192)), 0)
         self._providers = self._load_providers()
+        self._default_provider_id = str(self._cfg_get("default_provider_id", "")).strip()
+        self._default_provider = self._providers.get(self._default_provider_id) or next(
+            iter(self._providers.values()), None
+        )
         timeout = float(self._cfg_get("request_timeout_seconds", 45))
         self._client = VideoApiClient(timeout_seconds=max(timeout, 5.0), debug=self._debug)
 
@@ -51,6 +124,12 @@ class VideoGenerateToolPlugin(Star):
         self._cache_cleanup_task = asyncio.create_task(
             self._cache_cleanup_loop(cleanup_interval)
         )
+        flush_interval = max(float(self._cfg_get("kv_flush_interval_seconds", 3)), 0.5)
+        self._kv_flush_task = asyncio.create_task(self._kv_flush_loop(flush_interval))
+        await asyncio.gather(
+            *[self._client.warmup(provider) for provider in self._providers.values()],
+            return_exceptions=True,
+        )
         logger.info(
             f"[video_generate_tool] 插件已加载，已配置服务商数量: {len(self._providers)}"
         )
@@ -72,10 +151,9 @@ class VideoGenerateToolPlugin(Star):
             yield event.plain_result("未配置任何视频服务商，请先在插件配置里填写 providers。")
             return
 
-        default_provider_id = self._cfg_get("default_provider_id", "")
         lines = ["当前可用服务商："]
         for provider_id, provider in self._providers.items():
-            tag = " (default)" if provider_id == default_provider_id else ""
+            tag = " (default)" if provider_id == self._default_provider_id else ""
             model = provider.model or "-"
             lines.append(f"- {provider_id}{tag}, model={model}, base_url={provider.base_url}")
         yield event.plain_result("\n".join(lines))
@@ -97,20 +175,27 @@ class VideoGenerateToolPlugin(Star):
 
         try:
             submit_snapshot = await self._client.submit(provider=provider, prompt=prompt)
-            await self._save_task(event, submit_snapshot, prompt=prompt, model=provider.model)
+            # 随后立即轮询，最终结果会再次保存并落盘，这里只写内存
+            await self._save_task(
+                event, submit_snapshot, prompt=prompt, model=provider.model, persist=False
+            )
         except VideoApiError as exc:
             yield event.plain_result(f"提交视频任务失败: {exc}")
             return
 
-        yield event.plain_result(
-            f"任务已提交: provider={provider.provider_id}, task_id={submit_snapshot.task_id or 'N/A'}, "
-            f"status={submit_snapshot.status}。正在等待生成完成..."
-        )
+        try:
+            yield event.plain_result(
+                f"任务已提交: provider={provider.provider_id}, task_id={submit_snapshot.task_id or 'N/A'}, "
+                f"status={submit_snapshot.status}。正在等待生成完成..."
+            )
 
-        final_snapshot = await self._wait_for_result(provider, submit_snapshot)
-        await self._save_task(event, final_snapshot, prompt=prompt, model=provider.model)
+            final_snapshot = await self._wait_for_result(provider, submit_snapshot)
+            await self._save_task(event, final_snapshot, prompt=prompt, model=provider.model)
+        finally:
+            # 轮询被取消或异常退出时，提交时仅写入内存的记录仍需落盘
+            self._queue_memory_only_tasks([submit_snapshot.task_id])
 
-        if self._is_failed(provider, final_snapshot):
+        if provider.is_failed(final_snapshot):
             detail = final_snapshot.error_message or final_snapshot.status
             yield event.plain_result(f"视频生成失败: task_id={final_snapshot.task_id}, detail={detail}")
             return
@@ -231,7 +316,13 @@ class VideoGenerateToolPlugin(Star):
                 model_override=model,
                 extra_options=options,
             )
-            await self._save_task(event, submit_snapshot, prompt=prompt, model=model or provider.model)
+            await self._save_task(
+                event,
+                submit_snapshot,
+                prompt=prompt,
+                model=model or provider.model,
+                persist=not wait,
+            )
         except VideoApiError as exc:
             return f"video_generate 调用失败: {exc}"
 
@@ -242,15 +333,20 @@ class VideoGenerateToolPlugin(Star):
             )
 
         llm_wait_timeout = max(int(self._cfg_get("llm_wait_timeout_seconds", 10)), 1)
-        final_snapshot = await self._wait_for_result(
-            provider,
-            submit_snapshot,
-            max_wait_seconds=llm_wait_timeout,
-            swallow_cancel=True,
-        )
-        await self._save_task(event, final_snapshot, prompt=prompt, model=model or provider.model)
+        try:
+            final_snapshot = await self._wait_for_result(
+                provider,
+                submit_snapshot,
+                max_wait_seconds=llm_wait_timeout,
+                swallow_cancel=True,
+            )
+            await self._save_task(
+                event, final_snapshot, prompt=prompt, model=model or provider.model
+            )
+        finally:
+            self._queue_memory_only_tasks([submit_snapshot.task_id])
 
-        if self._is_failed(provider, final_snapshot):
+        if provider.is_failed(final_snapshot):
             return (
                 "video_generate 任务失败: "
                 f"task_id={final_snapshot.task_id}, "
@@ -281,9 +377,13 @@ class VideoGenerateToolPlugin(Star):
         """查询视频任务状态，可由 AI 自动调用。
 
         Args:
-            task_id(string): 任务 ID
+            task_id(string): 任务 ID，多个任务可用英文逗号分隔一次查询
             _(string): 内部保留参数，忽略
         """
+        task_ids = self._parse_csv(task_id)
+        if len(task_ids) > 1:
+            return await self._query_status_batch(event, task_ids)
+
         snapshot = await self._load_task(task_id)
         if snapshot is None:
             return f"video_query_status: 未找到 task_id={task_id} 的本地记录。"
@@ -300,6 +400,35 @@ class VideoGenerateToolPlugin(Star):
         except VideoApiError as exc:
             return f"video_query_status 查询失败: {exc}"
 
+        return self._format_query_status(task_id, latest)
+
+    async def _query_status_batch(self, event: AstrMessageEvent, task_ids: list[str]) -> str:
+        snapshots = await asyncio.gather(*[self._load_task(task_id) for task_id in task_ids])
+        lines: dict[str, str] = {}
+        jobs: list[tuple[ProviderConfig, str]] = []
+        for task_id, snapshot in zip(task_ids, snapshots):
+            provider = self._providers.get(snapshot.provider_id) if snapshot else None
+            if snapshot is None:
+                lines[task_id] = f"video_query_status: 未找到 task_id={task_id} 的本地记录。"
+            elif provider is None:
+                lines[task_id] = f"video_query_status: 服务商 `{snapshot.provider_id}` 未配置。"
+            else:
+                jobs.append((provider, task_id))
+
+        # 所有任务的查询并发进行（各服务商仍受并发上限约束），总耗时取决于最慢的一次请求
+        results = await self._client.query_many(jobs)
+        for (provider, task_id), result in zip(jobs, results):
+            if isinstance(result, VideoApiError):
+                lines[task_id] = f"video_query_status 查询失败: task_id={task_id}, {result}"
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            await self._save_task(event, result, prompt="", model=provider.model)
+            lines[task_id] = self._format_query_status(task_id, result)
+        return "\n".join(lines[task_id] for task_id in task_ids)
+
+    @staticmethod
+    def _format_query_status(task_id: str, latest: TaskSnapshot) -> str:
         if latest.video_url:
             return (
                 f"video_query_status: completed, task_id={task_id}, url={latest.video_url}"
@@ -312,6 +441,9 @@ class VideoGenerateToolPlugin(Star):
 
     async def terminate(self):
         await self._cancel_cleanup_tasks()
+        self._queue_memory_only_tasks()
+        await self._stop_kv_flusher()
+        await self._flush_kv()
         await self._client.close()
         logger.info("[video_generate_tool] 插件已卸载。")
 
@@ -322,7 +454,7 @@ class VideoGenerateToolPlugin(Star):
         max_wait_seconds: int | None = None,
         swallow_cancel: bool = False,
     ) -> TaskSnapshot:
-        if self._is_terminal(provider, snapshot):
+        if provider.is_terminal(snapshot):
             return snapshot
 
         task_id = snapshot.task_id
@@ -331,40 +463,53 @@ class VideoGenerateToolPlugin(Star):
 
         interval = max(int(self._cfg_get("poll_interval_seconds", 6)), 1)
         attempts = max(int(self._cfg_get("max_poll_attempts", 20)), 1)
+        # 轮询总预算（秒），未配置或不大于 0 时沿用 间隔 × 次数 的旧语义
+        total_seconds = float(self._cfg_get("poll_total_seconds", 0) or 0)
+        if total_seconds <= 0:
+            total_seconds = float(interval * attempts)
+        if max_wait_seconds is not None:
+            total_seconds = min(total_seconds, float(max_wait_seconds))
 
         latest = snapshot
         started_at = time.monotonic()
         consecutive_errors = 0
         max_transient_errors = 3
-        for attempt in range(attempts):
-            sleep_seconds = float(interval)
-            if max_wait_seconds is not None:
-                elapsed = time.monotonic() - started_at
-                remaining = float(max_wait_seconds) - elapsed
-                if remaining <= 0:
+        # 指数退避：从较短间隔起步，按 1.25 倍增长，以 poll_interval_seconds 为上限；
+        # 加入随机抖动，避免并发任务同步轮询
+        poll_delay = min(self._POLL_INITIAL_DELAY, float(interval))
+        next_sleep = poll_delay + random.uniform(0, 0.25 * poll_delay)
+        attempt = 0
+        while True:
+            elapsed = time.monotonic() - started_at
+            remaining = total_seconds - elapsed
+            if remaining <= 0:
+                if self._debug:
                     self._debug_log(
                         f"轮询达到等待预算上限: task_id={task_id}, "
-                        f"max_wait_seconds={max_wait_seconds}, status={latest.status}"
+                        f"total_seconds={total_seconds:g}, status={latest.status}"
                     )
-                    return latest
-                sleep_seconds = min(sleep_seconds, remaining)
+                return latest
             try:
-                await asyncio.sleep(sleep_seconds)
+                await asyncio.sleep(min(next_sleep, remaining))
             except asyncio.CancelledError:
                 if swallow_cancel:
-                    self._debug_log(f"轮询被取消，返回当前状态: task_id={task_id}, status={latest.status}")
+                    if self._debug:
+                        self._debug_log(f"轮询被取消，返回当前状态: task_id={task_id}, status={latest.status}")
                     return latest
                 raise
-            self._debug_log(
-                f"轮询第 {attempt + 1}/{attempts} 次: task_id={task_id}, "
-                f"当前状态={latest.status or '(未知)'}"
-            )
+            attempt += 1
+            if self._debug:
+                self._debug_log(
+                    f"轮询第 {attempt} 次 (已等待 {time.monotonic() - started_at:.1f}s): "
+                    f"task_id={task_id}, 当前状态={latest.status or '(未知)'}"
+                )
             try:
                 latest = await self._client.query(provider=provider, task_id=task_id)
                 consecutive_errors = 0
             except VideoApiError as exc:
                 consecutive_errors += 1
-                self._debug_log(f"轮询出错 (连续第 {consecutive_errors} 次): {exc}")
+                if self._debug:
+                    self._debug_log(f"轮询出错 (连续第 {consecutive_errors} 次): {exc}")
                 if consecutive_errors >= max_transient_errors:
                     return TaskSnapshot(
                         provider_id=latest.provider_id,
@@ -374,30 +519,17 @@ class VideoGenerateToolPlugin(Star):
                         error_message=str(exc),
                         raw=latest.raw,
                     )
+                # 出错后按 0.5s、1s、2s… 快速重试，与正常轮询的退避节奏相互独立
+                next_sleep = min(
+                    self._POLL_ERROR_BASE_DELAY * 2 ** (consecutive_errors - 1), float(interval)
+                )
                 continue
-            if self._is_terminal(provider, latest):
-                self._debug_log(f"任务已终态: status={latest.status}, video_url={'(有)' if latest.video_url else '(无)'}")
+            if provider.is_terminal(latest):
+                if self._debug:
+                    self._debug_log(f"任务已终态: status={latest.status}, video_url={'(有)' if latest.video_url else '(无)'}")
                 return latest
-        self._debug_log(f"轮询结束（已达最大次数 {attempts}）: task_id={task_id}, status={latest.status}")
-        return latest
-
-    def _is_terminal(self, provider: ProviderConfig, snapshot: TaskSnapshot) -> bool:
-        if snapshot.video_url:
-            return True
-        status = (snapshot.status or "").strip().lower()
-        done = {item.lower() for item in provider.done_values}
-        failed = {item.lower() for item in provider.failed_values}
-        return status in done or status in failed
-
-    def _is_failed(self, provider: ProviderConfig, snapshot: TaskSnapshot) -> bool:
-        status = (snapshot.status or "").strip().lower()
-        failed = {item.lower() for item in provider.failed_values}
-        if status in failed:
-            return True
-        # 仅在状态为终态（非进行中）时才通过 error_message 判断失败
-        done = {item.lower() for item in provider.done_values}
-        is_terminal_status = status in done or status in failed
-        return bool(is_terminal_status and snapshot.error_message and not snapshot.video_url)
+            poll_delay = min(poll_delay * self._POLL_BACKOFF_FACTOR, float(interval))
+            next_sleep = poll_delay + random.uniform(0, 0.25 * poll_delay)
 
     def _video_chain_result(
         self, event: AstrMessageEvent, text: str, video_url: str
@@ -536,14 +668,9 @@ class VideoGenerateToolPlugin(Star):
         provider_id = provider_id.strip()
         if provider_id:
             return self._providers.get(provider_id)
-        default_provider_id = self._cfg_get("default_provider_id", "")
-        if default_provider_id and default_provider_id in self._providers:
-            return self._providers[default_provider_id]
-        if self._providers:
-            return next(iter(self._providers.values()))
-        return None
+        return self._default_provider
 
-    _VALID_HTTP_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+    _VALID_HTTP_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE"})
 
     def _load_providers(self) -> dict[str, ProviderConfig]:
         result: dict[str, ProviderConfig] = {}
@@ -559,8 +686,8 @@ class VideoGenerateToolPlugin(Star):
             if not provider_id or not base_url:
                 continue
 
-            submit_method = str(item.get("submit_method", "POST")).strip().upper()
-            status_method = str(item.get("status_method", "GET")).strip().upper()
+            submit_method = self._normalize_http_method(item.get("submit_method", "POST"))
+            status_method = self._normalize_http_method(item.get("status_method", "GET"))
             if submit_method not in self._VALID_HTTP_METHODS:
                 logger.warning(
                     f"[video_generate_tool] 服务商 {provider_id} 的 submit_method '{submit_method}' 不合法，已跳过。"
@@ -574,10 +701,10 @@ class VideoGenerateToolPlugin(Star):
 
             done_values = self._parse_csv(
                 str(item.get("done_values", "succeeded,completed,success,done,finished"))
-            )
+            ) or ["succeeded", "completed", "success", "done", "finished"]
             failed_values = self._parse_csv(
                 str(item.get("failed_values", "failed,error,cancelled,canceled,rejected"))
-            )
+            ) or ["failed", "error", "cancelled", "canceled", "rejected"]
 
             config = ProviderConfig(
                 provider_id=provider_id,
@@ -596,8 +723,8 @@ class VideoGenerateToolPlugin(Star):
                 status_field=str(item.get("status_field", "status")).strip(),
                 output_url_field=str(item.get("output_url_field", "output[0].url")).strip(),
                 error_field=str(item.get("error_field", "error.message")).strip(),
-                done_values=done_values or ["succeeded", "completed", "success", "done", "finished"],
-                failed_values=failed_values or ["failed", "error", "cancelled", "canceled", "rejected"],
+                done_values=done_values,
+                failed_values=failed_values,
                 extra_headers=self._parse_json_object(
                     item.get("extra_headers_json", "{}"), f"{provider_id}.extra_headers_json"
                 ),
@@ -607,35 +734,46 @@ class VideoGenerateToolPlugin(Star):
                 status_request_id_field=str(item.get("status_request_id_field", "")).strip(),
                 duration_field=str(item.get("duration_field", "duration")).strip() or "duration",
                 aspect_ratio_field=str(item.get("aspect_ratio_field", "aspect_ratio")).strip() or "aspect_ratio",
+                max_concurrency=int(item.get("max_concurrency", 8) or 0),
+                http2=bool(item.get("http2", True)),
             )
             result[provider_id] = config
-            self._debug_log(
-                f"加载服务商: id={provider_id}, base_url={base_url}, "
-                f"model={config.model or '(未设置)'}, submit={submit_method} {config.submit_path}, "
-                f"status={status_method} {config.status_path_template}"
-            )
+            if self._debug:
+                self._debug_log(
+                    f"加载服务商: id={provider_id}, base_url={base_url}, "
+                    f"model={config.model or '(未设置)'}, submit={submit_method} {config.submit_path}, "
+                    f"status={status_method} {config.status_path_template}"
+                )
         return result
 
+    @staticmethod
+    def _normalize_http_method(raw_value: Any) -> str:
+        method = raw_value if isinstance(raw_value, str) else str(raw_value)
+        method = method.strip()
+        # 常见配置本就是大写（POST/GET），此时无需再分配新字符串
+        return method if method.isupper() else method.upper()
+
     @staticmethod
     def _parse_csv(raw_text: str) -> list[str]:
-        return [part.strip() for part in raw_text.split(",") if part.strip()]
+        return [part for part in map(str.strip, raw_text.split(",")) if part]
 
     @staticmethod
-    def _parse_json_object(raw_value: Any, field_name: str) -> dict[str, Any]:
+    def _parse_json_object(raw_value: Any, field_name: str) -> Mapping[str, Any]:
+        """解析 JSON 对象配置，返回只读映射，调用方不得修改。"""
         if isinstance(raw_value, Mapping):
-            return dict(raw_value)
+            return MappingProxyType(dict(raw_value))
         text = str(raw_value or "").strip()
         if not text:
-            return {}
+            return MappingProxyType({})
         try:
-            data = json.loads(text)
-        except json.JSONDecodeError:
+            data = json_loads(text)
+        except ValueError:
             logger.warning(f"配置项 {field_name} 不是合法 JSON，已忽略。")
-            return {}
+            return MappingProxyType({})
         if not isinstance(data, Mapping):
             logger.warning(f"配置项 {field_name} 需要 JSON 对象，已忽略。")
-            return {}
-        return dict(data)
+            return MappingProxyType({})
+        return MappingProxyType(dict(data))
 
     def _cfg_get(self, key: str, default: Any) -> Any:
         if isinstance(self.config, Mapping):
@@ -646,12 +784,39 @@ class VideoGenerateToolPlugin(Star):
         return default
 
     async def _save_task(
-        self, event: AstrMessageEvent, snapshot: TaskSnapshot, prompt: str, model: str
+        self,
+        event: AstrMessageEvent,
+        snapshot: TaskSnapshot,
+        prompt: str,
+        model: str,
+        persist: bool = True,
     ) -> None:
+        """保存任务记录。persist=False 时只更新内存缓存，适用于随后立即轮询并再次保存的场景。"""
         if not snapshot.task_id:
             return
 
         now = int(time.time())
+        task_id = snapshot.task_id
+        unpersisted = task_id in self._memory_only_tasks
+        last_task_key = self._session_last_task_key(event)
+        if self._session_last_task.get(last_task_key) != task_id or (persist and unpersisted):
+            self._session_last_task[last_task_key] = task_id
+            if persist:
+                self._dirty_last_task[last_task_key] = task_id
+
+        cached = self._task_cache.get(task_id)
+        if cached is not None and not (persist and unpersisted):
+            cached_record = cached[0]
+            if (
+                cached_record.get("status") == snapshot.status
+                and cached_record.get("video_url") == snapshot.video_url
+                and cached_record.get("error_message") == snapshot.error_message
+            ):
+                # 状态未变化：仅刷新内存中的更新时间，不产生 KV 写入
+                cached_record["updated_at"] = now
+                return
+
+        snapshot = self._with_bounded_raw(snapshot)
         record = {
             "provider_id": snapshot.provider_id,
             "task_id": snapshot.task_id,
@@ -663,50 +828,151 @@ class VideoGenerateToolPlugin(Star):
             "model": model,
             "updated_at": now,
         }
-        self._task_cache[snapshot.task_id] = record
-        while len(self._task_cache) > self._TASK_CACHE_MAX:
-            self._task_cache.popitem(last=False)
+        self._task_cache[task_id] = (record, snapshot)
+        if not persist:
+            self._memory_only_tasks.add(task_id)
+            return
+        self._memory_only_tasks.discard(task_id)
+        self._dirty_tasks[task_id] = record
+
+        # 终态（或服务商已不在配置中）立即落盘，其余交给后台定期合并写入
+        provider = self._providers.get(snapshot.provider_id)
+        if provider is None or provider.is_terminal(snapshot):
+            await self._flush_kv()
+
+    def _queue_memory_only_tasks(self, task_ids: list[str] | None = None) -> None:
+        """把仅存在于内存的任务记录（及指向它们的会话指针）加入写入队列。
 
-        await self._safe_put_kv(f"video_task:{snapshot.task_id}", record)
-        await self._safe_put_kv(self._session_last_task_key(event), snapshot.task_id)
+        task_ids 为 None 时处理全部，供插件卸载时使用。
+        """
+        if task_ids is None:
+            pending = set(self._memory_only_tasks)
+        else:
+            pending = {task_id for task_id in task_ids if task_id in self._memory_only_tasks}
+        if not pending:
+            return
+        self._memory_only_tasks -= pending
+        for task_id in pending:
+            cached = self._task_cache.get(task_id)
+            if cached is not None:
+                self._dirty_tasks[task_id] = cached[0]
+        for key, task_id in list(self._session_last_task.items()):
+            if task_id in pending:
+                self._dirty_last_task[key] = task_id
+
+    def _with_bounded_raw(self, snapshot: TaskSnapshot) -> TaskSnapshot:
+        """原始响应过大时只保留摘要字段，避免撑大内存缓存与 KV 记录。"""
+        if not snapshot.raw or self._raw_max_chars <= 0:
+            return snapshot
+        try:
+            size = len(json_dumps(snapshot.raw))
+        except (TypeError, ValueError):
+            size = self._raw_max_chars + 1
+        if size <= self._raw_max_chars:
+            return snapshot
+        return TaskSnapshot(
+            provider_id=snapshot.provider_id,
+            task_id=snapshot.task_id,
+            status=snapshot.status,
+            video_url=snapshot.video_url,
+            error_message=snapshot.error_message,
+            raw={
+                "_truncated": True,
+                "task_id": snapshot.task_id,
+                "status": snapshot.status,
+                "video_url": snapshot.video_url,
+                "error_message": snapshot.error_message,
+            },
+        )
+
+    async def _flush_kv(self) -> None:
+        async with self._kv_flush_lock:
+            if not self._dirty_tasks and not self._dirty_last_task:
+                return
+            dirty_tasks, self._dirty_tasks = self._dirty_tasks, {}
+            dirty_last_task, self._dirty_last_task = self._dirty_last_task, {}
+            try:
+                await asyncio.gather(
+                    *[
+                        self._safe_put_kv(f"video_task:{task_id}", record)
+                        for task_id, record in dirty_tasks.items()
+                    ],
+                    *[
+                        self._safe_put_kv(key, task_id)
+                        for key, task_id in dirty_last_task.items()
+                    ],
+                )
+            except asyncio.CancelledError:
+                # 被取消时把本批数据放回队列（不覆盖期间产生的新值），由下一次刷新重写
+                for task_id, record in dirty_tasks.items():
+                    self._dirty_tasks.setdefault(task_id, record)
+                for key, task_id in dirty_last_task.items():
+                    self._dirty_last_task.setdefault(key, task_id)
+                raise
+
+    async def _kv_flush_loop(self, interval_seconds: float) -> None:
+        while not self._kv_flush_stop.is_set():
+            try:
+                await asyncio.wait_for(self._kv_flush_stop.wait(), timeout=interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            await self._flush_kv()
+
+    async def _stop_kv_flusher(self) -> None:
+        if self._kv_flush_task is None:
+            return
+        # 通过停止信号而非 cancel() 结束，避免中断正在进行的写入
+        self._kv_flush_stop.set()
+        await asyncio.gather(self._kv_flush_task, return_exceptions=True)
+        self._kv_flush_task = None
 
     async def _load_task(self, task_id: str) -> TaskSnapshot | None:
         cached = self._task_cache.get(task_id)
-        if isinstance(cached, Mapping):
-            return TaskSnapshot.from_dict(cached)
+        if cached is not None:
+            return cached[1]
+        dirty = self._dirty_tasks.get(task_id)
+        if dirty is not None:
+            return TaskSnapshot.from_dict(dirty)
 
         stored = await self._safe_get_kv(f"video_task:{task_id}")
         if isinstance(stored, Mapping):
-            self._task_cache[task_id] = dict(stored)
-            return TaskSnapshot.from_dict(stored)
+            snapshot = TaskSnapshot.from_dict(stored)
+            self._task_cache[task_id] = (dict(stored), snapshot)
+            return snapshot
         return None
 
     async def _load_last_task_id(self, event: AstrMessageEvent) -> str:
         key = self._session_last_task_key(event)
-        value = await self._safe_get_kv(key)
+        value = self._session_last_task.get(key) or await self._safe_get_kv(key)
         if value:
             return str(value)
         return ""
 
     @staticmethod
     def _session_last_task_key(event: AstrMessageEvent) -> str:
-        return f"video_last_task:{event.unified_msg_origin}"
+        # 同一事件内会多次保存任务，键缓存在事件实例上，避免重复拼接
+        event_dict = getattr(event, "__dict__", None)
+        if event_dict is None:
+            return f"video_last_task:{event.unified_msg_origin}"
+        key = event_dict.get("_video_last_task_key")
+        if key is None:
+            key = f"video_last_task:{event.unified_msg_origin}"
+            event_dict["_video_last_task_key"] = key
+        return key
 
     async def _safe_put_kv(self, key: str, value: Any) -> None:
-        putter = getattr(self, "put_kv_data", None)
-        if not callable(putter):
+        if self._put_kv is None:
             return
         try:
-            await putter(key, value)
+            await self._put_kv(key, value)
         except Exception as exc:
             logger.warning(f"写入 KV 数据失败: key={key}, err={exc}")
 
     async def _safe_get_kv(self, key: str) -> Any:
-        getter = getattr(self, "get_kv_data", None)
-        if not callable(getter):
+        if self._get_kv is None:
             return None
         try:
-            return await getter(key)
+            return await self._get_kv(key)
         except Exception as exc:
             logger.warning(f"读取 KV 数据失败: key={key}, err={exc}")
             return None
@@ -1,25 +1,72 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import logging
-import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Mapping
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Callable, Mapping, Sequence
 from urllib.parse import quote
 
 import httpx
 
+try:
+    # 可选依赖 orjson：更快的 JSON 解析/序列化，未安装时回退标准库
+    import orjson
+
+    def json_loads(data: str | bytes) -> Any:
+        return orjson.loads(data)
+
+    def json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    def json_dumps_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:  # pragma: no cover - 未安装 orjson
+    import json
+
+    json_loads = json.loads
+
+    def json_dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    def json_dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+try:
+    # 可选依赖 h2：启用 HTTP/2，同一服务商的并发轮询可复用单条连接
+    import h2  # noqa: F401
+
+    _HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - 未安装 h2 时使用 HTTP/1.1
+    _HTTP2_AVAILABLE = False
+
 _logger = logging.getLogger(__name__)
 
-_JSON_PATH_TOKEN = re.compile(r"([^[\].]+)|\[(\d+)\]")
+# 全插件共用一个连接池：轮询反复访问同一服务商，保持长连接可省去 TCP/TLS 握手
+_POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=50,
+    keepalive_expiry=60.0,
+)
+_WARMUP_TIMEOUT = httpx.Timeout(5.0)
+
+# 终态查询结果缓存：任务完成/失败后状态不再变化，命中时无需再请求服务商
+_RESULT_CACHE_TTL_SECONDS = 3600.0
+_RESULT_CACHE_MAX = 256
 
 
 class VideoApiError(RuntimeError):
     """视频 API 调用异常。"""
 
 
-@dataclass
+@dataclass(slots=True)
 class ProviderConfig:
     provider_id: str
     base_url: str
@@ -41,16 +88,87 @@ class ProviderConfig:
     failed_values: list[str] = field(
         default_factory=lambda: ["failed", "error", "cancelled", "canceled", "rejected"]
     )
-    extra_headers: dict[str, str] = field(default_factory=dict)
-    extra_body: dict[str, Any] = field(default_factory=dict)
+    # done_values / failed_values 的小写集合，构造时预先计算，供轮询时直接做哈希判断
+    done_values_lc: frozenset[str] = field(init=False, repr=False, compare=False)
+    failed_values_lc: frozenset[str] = field(init=False, repr=False, compare=False)
+    # 只读映射，调用方不得修改；需要追加字段时先复制
+    extra_headers: Mapping[str, str] = field(default_factory=dict)
+    extra_body: Mapping[str, Any] = field(default_factory=dict)
     # 非 GET 状态查询时请求体中的任务 ID 字段名，留空则自动从 task_id_field 取叶子节点
     status_request_id_field: str = ""
     # duration 和 aspect_ratio 在请求体中的字段名（不同服务商可能不同）
     duration_field: str = "duration"
     aspect_ratio_field: str = "aspect_ratio"
+    # 同一服务商同时进行中的提交/查询请求上限，<=0 表示不限制
+    max_concurrency: int = 8
+    # 是否允许使用 HTTP/2（需安装 h2），个别不兼容的服务商可关闭
+    http2: bool = True
+    # 由上面的路径字段预编译得到的取值函数，加载配置时生成一次，解析响应时直接调用
+    task_id_getter: Callable[[Any], Any] = field(init=False, repr=False, compare=False)
+    status_getter: Callable[[Any], Any] = field(init=False, repr=False, compare=False)
+    output_url_getter: Callable[[Any], Any] = field(init=False, repr=False, compare=False)
+    error_getter: Callable[[Any], Any] = field(init=False, repr=False, compare=False)
+    # 请求地址与请求头同样预先计算；状态地址保留 {task_id} 占位，请求头为只读映射
+    submit_url: str = field(init=False, repr=False, compare=False)
+    status_url_template: str = field(init=False, repr=False, compare=False)
+    submit_headers: Mapping[str, str] = field(init=False, repr=False, compare=False)
+    status_headers: Mapping[str, str] = field(init=False, repr=False, compare=False)
+    # 非 GET 状态查询时请求体中的任务 ID 键名，GET 查询时为空
+    status_id_key: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.done_values_lc = frozenset(value.strip().lower() for value in self.done_values)
+        self.failed_values_lc = frozenset(value.strip().lower() for value in self.failed_values)
+
+        self.task_id_getter = compile_json_path(self.task_id_field)
+        self.status_getter = compile_json_path(self.status_field)
+        self.output_url_getter = compile_json_path(self.output_url_field)
+        self.error_getter = compile_json_path(self.error_field)
+
+        self.submit_url = _join_url(self.base_url, self.submit_path)
+        self.status_url_template = _join_url(self.base_url, self.status_path_template)
+        self.submit_headers = self._headers_for(self.submit_method)
+        self.status_headers = self._headers_for(self.status_method)
+
+        self.status_id_key = ""
+        if self.status_method.upper() != "GET":
+            if self.status_request_id_field:
+                self.status_id_key = self.status_request_id_field
+            else:
+                leaf = self.task_id_field.rsplit(".", 1)[-1] if self.task_id_field else "id"
+                self.status_id_key = leaf.split("[")[0] or "id"
+
+    def is_done(self, snapshot: TaskSnapshot) -> bool:
+        return snapshot.status_lc in self.done_values_lc
+
+    def is_failed(self, snapshot: TaskSnapshot) -> bool:
+        """任务是否失败：状态命中失败取值，或已完成却只带错误信息而没有视频地址。"""
+        status = snapshot.status_lc
+        if status in self.failed_values_lc:
+            return True
+        # 仅在状态为终态（非进行中）时才通过 error_message 判断失败
+        return bool(
+            status in self.done_values_lc and snapshot.error_message and not snapshot.video_url
+        )
 
+    def is_terminal(self, snapshot: TaskSnapshot) -> bool:
+        """任务是否已结束：拿到视频地址，或状态命中完成/失败取值。"""
+        if snapshot.video_url:
+            return True
+        status = snapshot.status_lc
+        return status in self.done_values_lc or status in self.failed_values_lc
 
-@dataclass
+    def _headers_for(self, method: str) -> Mapping[str, str]:
+        headers: dict[str, str] = {}
+        if method.upper() != "GET":
+            headers["Content-Type"] = "application/json"
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        headers.update(self.extra_headers)
+        return MappingProxyType(headers)
+
+
+@dataclass(slots=True)
 class TaskSnapshot:
     provider_id: str
     task_id: str
@@ -58,6 +176,11 @@ class TaskSnapshot:
     video_url: str = ""
     error_message: str = ""
     raw: dict[str, Any] = field(default_factory=dict)
+    # 归一化（去空白、小写）后的状态，构造时计算一次，供终态/失败判断复用
+    status_lc: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.status_lc = (self.status or "").strip().lower()
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -81,39 +204,100 @@ class TaskSnapshot:
         )
 
 
-def extract_json_path(payload: Any, path: str) -> Any:
-    if not path:
-        return None
+@lru_cache(maxsize=1024)
+def _quote_task_id(task_id: str) -> str:
+    """同一任务会被反复轮询，缓存其 URL 编码结果。"""
+    return quote(task_id, safe="")
+
+
+def _is_plain_key(path: str) -> bool:
+    """`id`、`status` 这类单层键无需拆分路径，可直接按键取值。"""
+    return "." not in path and "[" not in path
+
+
+def _join_url(base_url: str, path: str) -> str:
+    return f"{base_url.rstrip('/')}/{path.lstrip('/')}"
+
+
+@lru_cache(maxsize=512)
+def _compile_path(path: str) -> tuple[str | int, ...]:
+    """将 `output[0].url` 形式的路径拆分为 ("output", 0, "url")，字符串为键、整数为下标。"""
+    tokens: list[str | int] = []
+    for segment in path.split("."):
+        if "[" not in segment:
+            if segment:
+                tokens.append(segment)
+            continue
+        head, *brackets = segment.split("[")
+        if head:
+            tokens.append(head)
+        for part in brackets:
+            part = part.rstrip("]")
+            if part.isdigit():
+                tokens.append(int(part))
+            elif part:
+                tokens.append(part)
+    return tuple(tokens)
+
+
+def _walk_path(payload: Any, tokens: tuple[str | int, ...]) -> Any:
     current = payload
-    for token in _JSON_PATH_TOKEN.finditer(path):
-        key, index = token.groups()
-        if key is not None:
+    for token in tokens:
+        if isinstance(token, str):
             if not isinstance(current, Mapping):
                 return None
-            current = current.get(key)
+            current = current.get(token)
         else:
-            if not isinstance(current, list):
-                return None
-            idx = int(index)
-            if idx < 0 or idx >= len(current):
+            if not isinstance(current, list) or token >= len(current):
                 return None
-            current = current[idx]
+            current = current[token]
         if current is None:
             return None
     return current
 
 
+def compile_json_path(path: str) -> Callable[[Any], Any]:
+    """预编译 JSON 路径，返回 payload -> 取值 的函数；路径为空时始终返回 None。"""
+    if not path:
+        return lambda payload: None
+    if _is_plain_key(path):
+        return lambda payload: payload.get(path) if isinstance(payload, Mapping) else None
+    tokens = _compile_path(path)
+    return lambda payload: _walk_path(payload, tokens)
+
+
+def extract_json_path(payload: Any, path: str) -> Any:
+    if not path:
+        return None
+    if _is_plain_key(path):
+        return payload.get(path) if isinstance(payload, Mapping) else None
+    return _walk_path(payload, _compile_path(path))
+
+
 class VideoApiClient:
     def __init__(self, timeout_seconds: float = 45.0, debug: bool = False):
         self.timeout_seconds = timeout_seconds
         self.debug = debug
-        _timeout = httpx.Timeout(
+        self._timeout = httpx.Timeout(
             connect=10.0,
             read=timeout_seconds,
             write=30.0,
             pool=10.0,
         )
-        self._http_client = httpx.AsyncClient(timeout=_timeout)
+        self._http_client = httpx.AsyncClient(
+            timeout=self._timeout, limits=_POOL_LIMITS, http2=_HTTP2_AVAILABLE
+        )
+        # 关闭了 http2 的服务商使用的 HTTP/1.1 客户端，首次需要时创建
+        self._http1_client: httpx.AsyncClient | None = None
+        # 进行中的状态查询：同一任务的并发查询共享一次 HTTP 请求
+        self._inflight: dict[tuple[str, str], asyncio.Task[TaskSnapshot]] = {}
+        # (provider_id, task_id) -> (写入时间, 终态快照)，按 LRU 淘汰
+        self._result_cache: OrderedDict[tuple[str, str], tuple[float, TaskSnapshot]] = (
+            OrderedDict()
+        )
+        # 按服务商的并发准入控制：条件变量 + 进行中计数
+        self._admission: dict[str, asyncio.Condition] = {}
+        self._active: dict[str, int] = {}
 
     def _debug_log(self, msg: str) -> None:
         if self.debug:
@@ -126,7 +310,23 @@ class VideoApiClient:
         return f"{key[:4]}***{key[-4:]}"
 
     async def close(self) -> None:
+        for task in list(self._inflight.values()):
+            task.cancel()
+        self._inflight.clear()
         await self._http_client.aclose()
+        if self._http1_client is not None:
+            await self._http1_client.aclose()
+
+    async def warmup(self, provider: ProviderConfig) -> None:
+        """预先建立到服务商的连接，使首次提交无需等待 TCP/TLS 握手。失败时静默忽略。"""
+        base_url = provider.base_url
+        try:
+            await self._client_for(provider).head(base_url, timeout=_WARMUP_TIMEOUT)
+            if self.debug:
+                self._debug_log(f"连接预热完成: {base_url}")
+        except httpx.HTTPError as exc:
+            if self.debug:
+                self._debug_log(f"连接预热失败（已忽略）: {base_url}, err={exc}")
 
     async def submit(
         self,
@@ -143,53 +343,137 @@ class VideoApiClient:
         if extra_options:
             payload.update(extra_options)
 
-        url = self._join_url(provider.base_url, provider.submit_path)
-        self._debug_log(
-            f"提交任务: provider={provider.provider_id}, method={provider.submit_method}, "
-            f"url={url}, model={model or '(默认)'}, prompt={prompt[:80]!r}"
-        )
-        data = await self._request_json(
-            method=provider.submit_method,
-            url=url,
-            headers=self._build_headers(provider, provider.submit_method),
-            json_payload=payload,
-            error_path=provider.error_field,
-        )
+        url = provider.submit_url
+        if self.debug:
+            self._debug_log(
+                f"提交任务: provider={provider.provider_id}, method={provider.submit_method}, "
+                f"url={url}, model={model or '(默认)'}, prompt={prompt[:80]!r}"
+            )
+        async with self._admit(provider):
+            data = await self._request_json(
+                method=provider.submit_method,
+                url=url,
+                headers=provider.submit_headers,
+                json_payload=payload,
+                error_getter=provider.error_getter,
+                http_client=self._client_for(provider),
+            )
         snapshot = self._snapshot_from_payload(provider, data)
-        self._debug_log(
-            f"提交响应: task_id={snapshot.task_id}, status={snapshot.status}"
-        )
+        if self.debug:
+            self._debug_log(
+                f"提交响应: task_id={snapshot.task_id}, status={snapshot.status}"
+            )
         return snapshot
 
     async def query(self, provider: ProviderConfig, task_id: str) -> TaskSnapshot:
-        status_path = provider.status_path_template.replace("{task_id}", quote(task_id, safe=""))
-        url = self._join_url(provider.base_url, status_path)
-        json_payload = None
-        if provider.status_method.upper() != "GET":
-            if provider.status_request_id_field:
-                id_key = provider.status_request_id_field
-            else:
-                leaf = provider.task_id_field.rsplit(".", 1)[-1] if provider.task_id_field else "id"
-                id_key = leaf.split("[")[0] or "id"
-            json_payload = {id_key: task_id}
-        self._debug_log(
-            f"查询任务: provider={provider.provider_id}, method={provider.status_method}, "
-            f"url={url}, task_id={task_id}"
+        key = (provider.provider_id, task_id)
+        cached = self._result_cache.get(key)
+        if cached is not None:
+            stored_at, snapshot = cached
+            if time.monotonic() - stored_at < _RESULT_CACHE_TTL_SECONDS:
+                self._result_cache.move_to_end(key)
+                if self.debug:
+                    self._debug_log(f"命中终态缓存: provider={provider.provider_id}, task_id={task_id}")
+                return snapshot
+            del self._result_cache[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_status(provider, task_id))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget_inflight(key, done))
+        elif self.debug:
+            self._debug_log(f"合并并发查询: provider={provider.provider_id}, task_id={task_id}")
+        # shield：单个调用方被取消时不影响共享同一请求的其他调用方
+        return await asyncio.shield(task)
+
+    async def submit_many(
+        self, jobs: Sequence[tuple[ProviderConfig, str]]
+    ) -> list[TaskSnapshot | BaseException]:
+        """并发提交多个 (服务商, 提示词) 任务，结果与 jobs 一一对应，失败项为异常对象。"""
+        return await asyncio.gather(
+            *[self.submit(provider=provider, prompt=prompt) for provider, prompt in jobs],
+            return_exceptions=True,
         )
-        data = await self._request_json(
-            method=provider.status_method,
-            url=url,
-            headers=self._build_headers(provider, provider.status_method),
-            json_payload=json_payload,
-            error_path=provider.error_field,
+
+    async def query_many(
+        self, jobs: Sequence[tuple[ProviderConfig, str]]
+    ) -> list[TaskSnapshot | BaseException]:
+        """并发查询多个 (服务商, 任务 ID)，结果与 jobs 一一对应，失败项为异常对象。"""
+        return await asyncio.gather(
+            *[self.query(provider=provider, task_id=task_id) for provider, task_id in jobs],
+            return_exceptions=True,
         )
+
+    def _forget_inflight(self, key: tuple[str, str], task: asyncio.Task[TaskSnapshot]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # 所有调用方都已取消时，避免出现 "exception was never retrieved" 警告
+            task.exception()
+
+    async def _fetch_status(self, provider: ProviderConfig, task_id: str) -> TaskSnapshot:
+        url = provider.status_url_template.replace("{task_id}", _quote_task_id(task_id))
+        json_payload = {provider.status_id_key: task_id} if provider.status_id_key else None
+        if self.debug:
+            self._debug_log(
+                f"查询任务: provider={provider.provider_id}, method={provider.status_method}, "
+                f"url={url}, task_id={task_id}"
+            )
+        async with self._admit(provider):
+            data = await self._request_json(
+                method=provider.status_method,
+                url=url,
+                headers=provider.status_headers,
+                json_payload=json_payload,
+                error_getter=provider.error_getter,
+                http_client=self._client_for(provider),
+            )
         snapshot = self._snapshot_from_payload(provider, data, fallback_task_id=task_id)
-        self._debug_log(
-            f"查询响应: task_id={snapshot.task_id}, status={snapshot.status}, "
-            f"video_url={'(有)' if snapshot.video_url else '(无)'}"
-        )
+        if provider.is_terminal(snapshot):
+            key = (provider.provider_id, task_id)
+            self._result_cache[key] = (time.monotonic(), snapshot)
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > _RESULT_CACHE_MAX:
+                self._result_cache.popitem(last=False)
+        if self.debug:
+            self._debug_log(
+                f"查询响应: task_id={snapshot.task_id}, status={snapshot.status}, "
+                f"video_url={'(有)' if snapshot.video_url else '(无)'}"
+            )
         return snapshot
 
+    @asynccontextmanager
+    async def _admit(self, provider: ProviderConfig) -> AsyncIterator[None]:
+        """限制同一服务商的并发请求数，超出上限时排队等待，避免连接池耗尽或触发上游限流。"""
+        if provider.max_concurrency <= 0:
+            yield
+            return
+        provider_id = provider.provider_id
+        cond = self._admission.get(provider_id)
+        if cond is None:
+            cond = self._admission[provider_id] = asyncio.Condition()
+        async with cond:
+            await cond.wait_for(
+                lambda: self._active.get(provider_id, 0) < provider.max_concurrency
+            )
+            self._active[provider_id] = self._active.get(provider_id, 0) + 1
+        try:
+            yield
+        finally:
+            async with cond:
+                self._active[provider_id] -= 1
+                # 唤醒全部等待者由 wait_for 重新判断：Python < 3.13 中若被单独唤醒的
+                # 等待者随即被取消，这次唤醒会丢失，其余等待者将一直阻塞
+                cond.notify_all()
+
+    def _client_for(self, provider: ProviderConfig) -> httpx.AsyncClient:
+        if provider.http2 or not _HTTP2_AVAILABLE:
+            return self._http_client
+        if self._http1_client is None:
+            self._http1_client = httpx.AsyncClient(timeout=self._timeout, limits=_POOL_LIMITS)
+        return self._http1_client
+
     async def download_video_to_file(
         self, video_url: str, dst_path: str, timeout_seconds: float
     ) -> None:
@@ -229,13 +513,13 @@ class VideoApiClient:
     def _snapshot_from_payload(
         self, provider: ProviderConfig, payload: Mapping[str, Any], fallback_task_id: str = ""
     ) -> TaskSnapshot:
-        task_id = self._as_text(extract_json_path(payload, provider.task_id_field))
+        task_id = self._as_text(provider.task_id_getter(payload))
         if not task_id:
             task_id = fallback_task_id
 
-        status = self._as_text(extract_json_path(payload, provider.status_field), default="unknown")
-        video_url = self._as_text(extract_json_path(payload, provider.output_url_field))
-        error_message = self._as_text(extract_json_path(payload, provider.error_field))
+        status = self._as_text(provider.status_getter(payload), default="unknown")
+        video_url = self._as_text(provider.output_url_getter(payload))
+        error_message = self._as_text(provider.error_getter(payload))
 
         if not task_id and not video_url:
             raise VideoApiError(
@@ -249,7 +533,8 @@ class VideoApiClient:
             status=status,
             video_url=video_url,
             error_message=error_message,
-            raw=dict(payload),
+            # _request_json 每次返回新建的 dict，直接引用即可，无需再复制
+            raw=payload if isinstance(payload, dict) else dict(payload),
         )
 
     async def _request_json(
@@ -257,8 +542,9 @@ class VideoApiClient:
         method: str,
         url: str,
         headers: Mapping[str, str],
-        json_payload: Mapping[str, Any] | None,
-        error_path: str,
+        json_payload: dict[str, Any] | None,
+        error_getter: Callable[[Any], Any],
+        http_client: httpx.AsyncClient | None = None,
     ) -> dict[str, Any]:
         if self.debug:
             masked_headers = {
@@ -270,23 +556,31 @@ class VideoApiClient:
             self._debug_log(f"请求头: {masked_headers}")
             self._debug_log(f"请求体: {body_preview}")
 
+        # 请求体预先序列化后以 content 传入，绕开 httpx 内部基于标准库 json 的序列化；
+        # content 不会自动附带 Content-Type，缺失时（如 GET 提交）在此补上
+        content = None
+        if json_payload is not None:
+            content = json_dumps_bytes(json_payload)
+            if not any(k.lower() == "content-type" for k in headers):
+                headers = {**headers, "Content-Type": "application/json"}
         try:
-            resp = await self._http_client.request(
+            resp = await (http_client or self._http_client).request(
                 method=method.upper(),
                 url=url,
-                headers=dict(headers),
-                json=dict(json_payload) if json_payload is not None else None,
+                headers=headers,
+                content=content,
             )
         except httpx.HTTPError as exc:
             raise VideoApiError(f"请求视频服务失败: {exc}") from exc
 
-        text = resp.text.strip()
+        # 直接解析原始字节，省去 bytes -> str 的整体解码与二次复制
+        body = resp.content.strip()
         payload: Any = {}
-        if text:
+        if body:
             try:
-                payload = resp.json()
+                payload = json_loads(body)
             except ValueError:
-                payload = {"raw_text": text}
+                payload = {"raw_text": resp.text.strip()}
         elif resp.status_code < 400:
             raise VideoApiError(
                 f"视频服务返回空响应体 (HTTP {resp.status_code})，无法获取任务 ID。"
@@ -294,24 +588,22 @@ class VideoApiClient:
             )
 
         if self.debug:
-            body_resp = text[:500] if text else "(空)"
+            body_resp = body[:500].decode(errors="replace") if body else "(空)"
             self._debug_log(f"响应状态: HTTP {resp.status_code}")
             self._debug_log(f"响应体: {body_resp}")
 
         if resp.status_code >= 400:
-            detail = self._as_text(extract_json_path(payload, error_path)) if payload else text
+            detail = self._as_text(error_getter(payload)) if payload else ""
             raise VideoApiError(
                 f"视频服务响应错误: HTTP {resp.status_code}, detail={detail or '无'}"
             )
 
+        if isinstance(payload, dict):
+            return payload
         if isinstance(payload, Mapping):
             return dict(payload)
         return {"data": payload}
 
-    @staticmethod
-    def _join_url(base_url: str, path: str) -> str:
-        return f"{base_url.rstrip('/')}/{path.lstrip('/')}"
-
     @staticmethod
     def _as_text(value: Any, default: str = "") -> str:
         if value is None:
@@ -319,13 +611,3 @@ class VideoApiClient:
         if isinstance(value, str):
             return value
         return str(value)
-
-    @staticmethod
-    def _build_headers(provider: ProviderConfig, method: str = "POST") -> dict[str, str]:
-        headers: dict[str, str] = {}
-        if method.upper() != "GET":
-            headers["Content-Type"] = "application/json"
-        if provider.api_key:
-            headers["Authorization"] = f"Bearer {provider.api_key}"
-        headers.update(provider.extra_headers)
-        return headers